@@ -4,7 +4,7 @@
 """
 
 import argparse
-from src.app import run_app, Mode
+from src.app import run_app, Mode, BATCH_CONCURRENCY
 
 
 def cli_main():
@@ -35,11 +35,29 @@ def cli_main():
         required=True,
         help="USERNAME/ID канала/группы",
     )
-    query_parser.add_argument(
+    query_source = query_parser.add_mutually_exclusive_group()
+    query_source.add_argument(
         "--query",
         type=str,
         help="Запрос для выполнения (если не указан, интерактивный режим)",
     )
+    query_source.add_argument(
+        "--batch",
+        type=str,
+        help="Файл с запросами (по одному на строку) для пакетного режима",
+    )
+    query_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=BATCH_CONCURRENCY,
+        help="Максимум одновременно выполняемых запросов в пакетном режиме",
+    )
+    query_parser.add_argument(
+        "--output",
+        type=str,
+        help="Файл для результатов пакетного режима в формате JSONL "
+        "(по умолчанию stdout)",
+    )
     query_parser.add_argument(
         "--update", action="store_true", help="Обновить индекс перед запросом"
     )
@@ -62,6 +80,8 @@ def cli_main():
     )
 
     args = parser.parse_args()
+    if args.command == "query" and args.concurrency < 1:
+        query_parser.error("--concurrency должен быть не меньше 1")
     run_app(args)
 
 
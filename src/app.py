@@ -1,8 +1,12 @@
 import asyncio
 import argparse
+import json
 import os
+import sys
+import time
 import logging
-from typing import Optional, Any
+from typing import Optional, Any, Dict, List
+from uuid import UUID
 import dotenv
 from enum import Enum
 
@@ -10,6 +14,7 @@ from langchain_openai import OpenAIEmbeddings
 from langchain_openai.chat_models import ChatOpenAI
 from langchain_community.vectorstores import FAISS
 from langchain_community.callbacks import get_openai_callback
+from langchain_community.callbacks.openai_info import OpenAICallbackHandler
 from langchain.prompts import (
     SystemMessagePromptTemplate,
     HumanMessagePromptTemplate,
@@ -43,6 +48,7 @@ TECH_SPEC_MODEL: str = os.getenv("TECH_SPEC_MODEL", "gpt-4")
 ANALYSIS_MODEL: str = os.getenv("ANALYSIS_MODEL", "gpt-4")
 TOP_K: int = int(os.getenv("TOP_K", "10"))
 LLM_TEMPERATURE: float = float(os.getenv("LLM_TEMPERATURE", "0.5"))
+BATCH_CONCURRENCY: int = int(os.getenv("BATCH_CONCURRENCY", "5"))
 
 PROMPTS_DIR = os.path.join(
     os.path.dirname(os.path.abspath(__file__)), "prompts"
@@ -72,6 +78,60 @@ class Mode(str, Enum):
     ANALYSIS = "analysis"
 
 
+class BatchItemCallbackHandler(OpenAICallbackHandler):
+    """
+    Считает токены, стоимость и время выполнения одного запроса пакета.
+    Время измеряется от старта до завершения корневой цепочки, поэтому
+    ожидание в очереди из-за ограничения параллельности не учитывается.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def on_chain_start(
+        self,
+        serialized: Dict[str, Any],
+        inputs: Dict[str, Any],
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        **kwargs: Any,
+    ) -> None:
+        if parent_run_id is None:
+            self.started_at = time.perf_counter()
+
+    def on_chain_end(
+        self,
+        outputs: Dict[str, Any],
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        **kwargs: Any,
+    ) -> None:
+        if parent_run_id is None:
+            self.finished_at = time.perf_counter()
+
+    def on_chain_error(
+        self,
+        error: BaseException,
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        **kwargs: Any,
+    ) -> None:
+        if parent_run_id is None:
+            self.finished_at = time.perf_counter()
+
+    @property
+    def latency(self) -> Optional[float]:
+        """Время выполнения запроса в секундах."""
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return round(self.finished_at - self.started_at, 3)
+
+
 def create_qa_chain(
     vectorstore: FAISS,
     prompt_manager: PromptManager,
@@ -145,22 +205,18 @@ def create_qa_chain(
     return retrieval_chain
 
 
-async def query_mode(
-    channel: str, init_query: Optional[str] = None, mode: Mode = Mode.TECH_SPEC
-) -> None:
+def load_channel_store(channel: str) -> Optional[FAISS]:
     """
-    Загружает индекс для заданного канала и выполняет запросы.
-    Если передан init_query – выполняется сразу, иначе интерактивный режим.
-    Использует одну и ту же цепочку для всех запросов для поддержки истории диалога.
+    Загружает индекс для заданного канала.
+    Возвращает None (и пишет ошибку в лог), если индекс не удалось загрузить.
     """
     index_path: str = get_index_path(channel)
     if not os.path.exists(index_path):
         logging.error(
             f"Индекс для канала {channel} не найден. Сначала выполните update."
         )
-        return
+        return None
 
-    prompt_manager = PromptManager(PROMPTS_DIR)
     embeddings = OpenAIEmbeddings(openai_api_key=OPENAI_API_KEY)
 
     try:
@@ -168,8 +224,25 @@ async def query_mode(
         logging.info(f"Загружен индекс для канала {channel}")
     except Exception as e:
         logging.error(f"Ошибка загрузки индекса: {e}")
+        return None
+
+    return vectorstore
+
+
+async def query_mode(
+    channel: str, init_query: Optional[str] = None, mode: Mode = Mode.TECH_SPEC
+) -> None:
+    """
+    Загружает индекс для заданного канала и выполняет запросы.
+    Если передан init_query – выполняется сразу, иначе интерактивный режим.
+    Использует одну и ту же цепочку для всех запросов для поддержки истории диалога.
+    """
+    vectorstore = load_channel_store(channel)
+    if vectorstore is None:
         return
 
+    prompt_manager = PromptManager(PROMPTS_DIR)
+
     try:
         chain = create_qa_chain(vectorstore, prompt_manager, mode)
 
@@ -210,6 +283,120 @@ async def query_mode(
         logging.error(f"Произошла ошибка: {str(e)}")
 
 
+def read_batch_queries(batch_path: str) -> List[str]:
+    """Читает запросы для пакетного режима: по одному на строку."""
+    with open(batch_path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+async def batch_query_mode(
+    channel: str,
+    batch_path: str,
+    mode: Mode = Mode.TECH_SPEC,
+    concurrency: int = BATCH_CONCURRENCY,
+    output_path: Optional[str] = None,
+) -> None:
+    """
+    Выполняет запросы из файла пакетно: индекс и цепочка создаются один раз,
+    запросы выполняются параллельно (не более concurrency одновременно).
+    Результаты пишутся в формате JSONL по мере готовности
+    в output_path или в stdout, по завершении в лог выводится сводка.
+    """
+    try:
+        queries = read_batch_queries(batch_path)
+    except OSError as e:
+        logging.error(f"Ошибка чтения файла запросов: {e}")
+        return
+
+    if not queries:
+        logging.error(f"В файле {batch_path} нет запросов.")
+        return
+
+    vectorstore = load_channel_store(channel)
+    if vectorstore is None:
+        return
+
+    prompt_manager = PromptManager(PROMPTS_DIR)
+
+    try:
+        chain = create_qa_chain(vectorstore, prompt_manager, mode)
+    except ValueError as e:
+        logging.error(str(e))
+        return
+
+    handlers = [BatchItemCallbackHandler() for _ in queries]
+    configs = [
+        {"callbacks": [handler], "max_concurrency": concurrency}
+        for handler in handlers
+    ]
+    inputs = [{"input": query, "chat_history": []} for query in queries]
+
+    logging.info(
+        f"Выполнение {len(queries)} запросов "
+        f"(параллельно не более {concurrency})"
+    )
+
+    out = (
+        open(output_path, "w", encoding="utf-8") if output_path else sys.stdout
+    )
+    failed = 0
+    latencies: List[float] = []
+    started_at = time.perf_counter()
+
+    try:
+        async for idx, result in chain.abatch_as_completed(
+            inputs, config=configs, return_exceptions=True
+        ):
+            handler = handlers[idx]
+            record: Dict[str, Any] = {
+                "index": idx,
+                "query": queries[idx],
+                "answer": None,
+                "source_ids": [],
+                "latency": handler.latency,
+                "usage": {
+                    "prompt_tokens": handler.prompt_tokens,
+                    "completion_tokens": handler.completion_tokens,
+                    "total_tokens": handler.total_tokens,
+                    "total_cost": handler.total_cost,
+                },
+                "error": None,
+            }
+
+            if isinstance(result, Exception):
+                failed += 1
+                record["error"] = str(result)
+                logging.error(f"Ошибка в запросе #{idx}: {result}")
+            else:
+                record["answer"] = result["answer"]
+                record["source_ids"] = [
+                    doc.metadata.get("id")
+                    for doc in result.get("context", [])
+                ]
+
+            if handler.latency is not None:
+                latencies.append(handler.latency)
+
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - started_at
+    avg_latency = sum(latencies) / len(latencies) if latencies else 0.0
+    logging.info(
+        f"Выполнено запросов: {len(queries) - failed}/{len(queries)}, "
+        f"ошибок: {failed}"
+    )
+    logging.info(
+        f"Общее время: {elapsed:.2f}с, "
+        f"среднее время запроса: {avg_latency:.2f}с"
+    )
+    logging.info(f"Всего токенов: {sum(h.total_tokens for h in handlers)}")
+    logging.info(f"Стоимость: {sum(h.total_cost for h in handlers)}$")
+
+
 async def show_groups() -> None:
     """
     Выводит список доступных групп и каналов.
@@ -234,6 +421,17 @@ def run_app(args: argparse.Namespace) -> None:
             filter_fwd = getattr(args, "fwd", True)
             if args.update:
                 asyncio.run(update_index(args.channel, filter_fwd))
-            asyncio.run(query_mode(args.channel, args.query, mode))
+            if args.batch:
+                asyncio.run(
+                    batch_query_mode(
+                        args.channel,
+                        args.batch,
+                        mode,
+                        args.concurrency,
+                        args.output,
+                    )
+                )
+            else:
+                asyncio.run(query_mode(args.channel, args.query, mode))
         case "list-groups":
             asyncio.run(show_groups())